@@ -1,10 +1,12 @@
 """Structured parsing of ISRC (International Standard Recording Code), as defined in ISO 3901:2019"""
 
+from .batch import ISRCBatch as ISRCBatch
 from .isrc import (
     DB_DATE as DB_DATE,
     ISRC as ISRC,
     Agency as Agency,
     Allocation as Allocation,
 )
+from .rangeset import ISRCRangeSet as ISRCRangeSet
 
 __version__ = "1.1.0"
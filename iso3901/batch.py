@@ -0,0 +1,318 @@
+"""Columnar batch of parsed ISRC, optionally in shared memory
+
+An `ISRCBatch` keeps parse results in 3 parallel arrays within a single
+buffer, so it can be handed to other processes without pickling every
+`ISRC` object. When the buffer lives in `multiprocessing.shared_memory`,
+other processes attach to it by name without copying.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Iterable,
+    Iterator,
+    Optional,
+    Sized,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from .isrc import ISRC, Allocation, _pack
+
+# multiprocessing is slow to import, so it is only loaded when
+# shared memory is actually used
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+__all__ = ("ISRCBatch",)
+
+_T = TypeVar("_T", bound="ISRCBatch")
+
+# Buffer layout: header, then packed codes (int64), prefix indexes
+# (uint16) and validity flags (uint8), each column holding N items
+_HEADER = struct.Struct("<8sQ")
+_MAGIC = b"ISRCBAT1"
+
+_PREFIXES = tuple(Allocation.__members__)
+_PREFIX_INDEX = {p: i for i, p in enumerate(_PREFIXES)}
+_NO_PREFIX = 0xFFFF
+
+
+def _size(count: int) -> int:
+    return _HEADER.size + count * 11
+
+
+_attach_lock = threading.Lock()
+
+
+def _attach_untracked(name: str) -> SharedMemory:
+    # Before python 3.13, attaching to shared memory registers it with
+    # resource tracker of current process, which unlinks the memory when
+    # process exits, even though it is owned by creator. Unregistering
+    # afterwards is not an option either, because child processes may
+    # share the tracker of creator, so that would drop registration of
+    # creator instead. Skip registering this segment altogether, which
+    # is what track=False does in python 3.13.
+    from multiprocessing import resource_tracker, shared_memory
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+
+    with _attach_lock:
+        register = resource_tracker.register
+        target = name.lstrip("/")
+
+        def _register(name: Sized, rtype: str) -> None:
+            if rtype != "shared_memory" or str(name).lstrip("/") != target:
+                register(name, rtype)
+
+        resource_tracker.register = _register
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class ISRCBatch:
+    """Parsed ISRC stored as parallel arrays
+
+    Batches are usually created with `from_strings()` or `from_isrcs()`,
+    or attached to existing shared memory with `attach()`. Item access
+    returns `ISRC` object, or None for invalid input; like
+    ``ISRC.unpack()``, the ``raw`` attribute is not preserved.
+
+    Pickling a shared batch only transfers its shared memory name;
+    other batches are pickled as raw buffer content.
+
+    Parameters
+    ----------
+    buffer : bytes-like object
+        Buffer holding batch data, such as one from another batch's
+        `buffer` property. It is used directly without copying.
+
+    Attributes
+    ----------
+    codes : memoryview
+        Packed ISRC keys (see ``ISRC.pack()``), 0 for invalid items
+    prefixes : memoryview
+        Index of prefix within `Allocation` enum, 0xFFFF for invalid items
+    valid : memoryview
+        1 for valid items, 0 otherwise
+    """
+
+    __slots__ = ("_buf", "_shm", "codes", "prefixes", "valid")
+
+    def __init__(
+        self,
+        buffer: Any,
+        *,
+        _shm: Optional[SharedMemory] = None,
+    ) -> None:
+        buf = memoryview(buffer).cast("B")
+        if len(buf) < _HEADER.size:
+            raise ValueError("Buffer too small for ISRCBatch")
+        magic, count = _HEADER.unpack_from(buf)
+        if magic != _MAGIC or len(buf) < _size(count):
+            raise ValueError("Buffer does not contain ISRCBatch data")
+        ofs = _HEADER.size
+        self._buf = buf
+        self._shm = _shm
+        self.codes = buf[ofs : ofs + count * 8].cast("q")
+        ofs += count * 8
+        self.prefixes = buf[ofs : ofs + count * 2].cast("H")
+        ofs += count * 2
+        self.valid = buf[ofs : ofs + count]
+
+    @classmethod
+    def _allocate(cls: Type[_T], count: int, shared: bool) -> _T:
+        shm = None
+        if shared:
+            from multiprocessing import shared_memory
+
+            shm = shared_memory.SharedMemory(create=True, size=_size(count))
+            buf: Union[bytearray, memoryview] = shm.buf
+        else:
+            buf = bytearray(_size(count))
+        _HEADER.pack_into(buf, 0, _MAGIC, count)
+        return cls(buf, _shm=shm)
+
+    @classmethod
+    def from_strings(
+        cls: Type[_T], items: Iterable[str], *, shared: bool = False
+    ) -> _T:
+        """Parses ISRC strings into a batch
+
+        Parameters
+        ----------
+        items : iterable of str
+            Strings to be parsed, following ``ISRC.parse()`` rules
+        shared : bool, optional
+            Whether to allocate batch in shared memory. Defaults to False.
+
+        Raises
+        ------
+        TypeError
+            If any item is not a string
+
+        Returns
+        -------
+        ISRCBatch
+            The resulting batch
+        """
+        items = list(items)
+        batch = cls._allocate(len(items), shared)
+        codes, prefixes, valid = batch.codes, batch.prefixes, batch.valid
+        try:
+            for i, s in enumerate(items):
+                try:
+                    owner, year, desig = ISRC._parse(s)
+                except ValueError:
+                    prefixes[i] = _NO_PREFIX
+                    continue
+                codes[i] = _pack(owner, year, desig)
+                prefixes[i] = _PREFIX_INDEX[owner[:2]]
+                valid[i] = 1
+        except BaseException:
+            batch._discard()
+            raise
+        return batch
+
+    @classmethod
+    def from_isrcs(cls: Type[_T], items: Iterable[ISRC], *, shared: bool = False) -> _T:
+        """Stores ISRC objects into a batch
+
+        Objects not allocated with legal prefix, or those which can't
+        be packed, are marked invalid.
+
+        Parameters
+        ----------
+        items : iterable of `ISRC`
+            ISRC objects to be stored
+        shared : bool, optional
+            Whether to allocate batch in shared memory. Defaults to False.
+
+        Returns
+        -------
+        ISRCBatch
+            The resulting batch
+        """
+        items = list(items)
+        batch = cls._allocate(len(items), shared)
+        codes, prefixes, valid = batch.codes, batch.prefixes, batch.valid
+        try:
+            for i, isrc in enumerate(items):
+                try:
+                    codes[i] = isrc.pack()
+                    prefixes[i] = _PREFIX_INDEX[isrc.prefix]
+                except (ValueError, KeyError):
+                    codes[i] = 0
+                    prefixes[i] = _NO_PREFIX
+                    continue
+                valid[i] = 1
+        except BaseException:
+            batch._discard()
+            raise
+        return batch
+
+    @classmethod
+    def attach(cls: Type[_T], name: str) -> _T:
+        """Attaches to batch in shared memory created by another process
+
+        Batch data is not copied. Call `close()` when finished; only the
+        creator of shared memory should call `unlink()`.
+
+        Parameters
+        ----------
+        name : str
+            Shared memory name, from `shm_name` property of original batch
+
+        Returns
+        -------
+        ISRCBatch
+            Batch backed by the shared memory
+        """
+        shm = _attach_untracked(name)
+        try:
+            return cls(shm.buf, _shm=shm)
+        except ValueError:
+            shm.close()
+            raise
+
+    @property
+    def shm_name(self) -> Optional[str]:
+        """Name of shared memory holding batch, or None if not shared"""
+        return None if self._shm is None else self._shm.name
+
+    @property
+    def buffer(self) -> memoryview:
+        """Whole underlying buffer, including header
+
+        For shared batches, returned view and any view derived from it
+        must be released before `close()`, otherwise it raises
+        `BufferError`. Using the view as context manager does so::
+
+            with batch.buffer as view:
+                sock.sendall(view)
+        """
+        return self._buf[: _size(len(self))]
+
+    def close(self) -> None:
+        """Detaches from underlying buffer
+
+        Batch is unusable afterwards. For shared batches, shared memory
+        remains available to other processes until `unlink()` is called.
+
+        Raises
+        ------
+        BufferError
+            If batch is shared and a view of `buffer` is still held
+        """
+        for view in (self.codes, self.prefixes, self.valid, self._buf):
+            view.release()
+        if self._shm is not None:
+            self._shm.close()
+
+    def unlink(self) -> None:
+        """Requests destruction of shared memory of this batch"""
+        if self._shm is not None:
+            self._shm.unlink()
+
+    def _discard(self) -> None:
+        # Release a batch which failed to be filled
+        self.close()
+        self.unlink()
+
+    def __enter__(self: _T) -> _T:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, index: int) -> Optional[ISRC]:
+        if not self.valid[index]:
+            return None
+        return ISRC.unpack(self.codes[index])
+
+    def __iter__(self) -> Iterator[Optional[ISRC]]:
+        for key, ok in zip(self.codes, self.valid):
+            yield ISRC.unpack(key) if ok else None
+
+    def prefix(self, index: int) -> Optional[str]:
+        """Returns ISRC prefix of item, or None if item is invalid"""
+        i = self.prefixes[index]
+        return None if i == _NO_PREFIX else _PREFIXES[i]
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        if self._shm is not None:
+            return (type(self).attach, (self._shm.name,))
+        return (type(self), (bytes(self.buffer),))
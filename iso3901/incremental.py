@@ -0,0 +1,212 @@
+"""Incremental re-validation of large ISRC listing files
+
+Files are split into content-defined chunks on line boundaries, so that
+editing a few lines only disturbs the chunks containing them. Validation
+result of each chunk is cached on disk, keyed by chunk digest and
+`DB_DATE`, so that any update of prefix allocation invalidates the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import zlib
+from typing import IO, Dict, Iterator, List, NamedTuple, Set, Tuple, Union
+
+from .isrc import DB_DATE, ISRC
+
+__all__ = ("ChunkCache", "ValidationResult", "validate_file")
+
+_CACHE_VERSION = 2
+
+
+class ValidationResult(NamedTuple):
+    """Outcome of validating a file line by line
+
+    Attributes
+    ----------
+    lines : int
+        Total number of lines in file
+    invalid : tuple of int
+        0-based line numbers failing ``ISRC.validate()``
+    chunks : int
+        Number of chunks file is split into
+    reparsed : int
+        Number of chunks not found in cache, hence validated again
+    """
+
+    lines: int
+    invalid: Tuple[int, ...]
+    chunks: int
+    reparsed: int
+
+
+class ChunkCache:
+    """On-disk cache of per-chunk validation result
+
+    Cache is stored as a single JSON file, loaded entirely into memory
+    when created and written back by ``save()``. Entries are keyed by
+    chunk digest together with `DB_DATE`. Only entries looked up or
+    stored since the cache was loaded are saved, so chunks which no
+    longer exist, or belong to other prefix allocation dates, are
+    dropped. Unreadable or malformed cache files are treated as empty.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        Location of cache file. It is fine if the file does not exist yet.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike[str]]) -> None:
+        self.path = os.fspath(path)
+        self._entries: Dict[str, Tuple[int, Tuple[int, ...]]] = {}
+        self._used: Set[str] = set()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+            return
+        try:
+            for key, (lines, invalid) in data["chunks"].items():
+                self._entries[key] = (int(lines), tuple(map(int, invalid)))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            self._entries.clear()
+
+    @staticmethod
+    def key(digest: str) -> str:
+        return f"{DB_DATE.isoformat()}:{digest}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str) -> Union[Tuple[int, Tuple[int, ...]], None]:
+        key = self.key(digest)
+        result = self._entries.get(key)
+        if result is not None:
+            self._used.add(key)
+        return result
+
+    def put(self, digest: str, lines: int, invalid: Tuple[int, ...]) -> None:
+        key = self.key(digest)
+        self._entries[key] = (lines, invalid)
+        self._used.add(key)
+
+    def save(self) -> None:
+        """Write entries used since loading back to disk atomically"""
+        chunks = {
+            k: [lines, list(inv)]
+            for k, (lines, inv) in self._entries.items()
+            if k in self._used
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": _CACHE_VERSION, "chunks": chunks}, f)
+        os.replace(tmp, self.path)
+
+
+def _lines(stream: IO[bytes]) -> Iterator[bytes]:
+    # Binary files only split on LF; also split on lone CR, so that lines
+    # are the same as reading in text mode with universal newlines
+    for line in stream:
+        if b"\r" not in line:
+            yield line
+            continue
+        body = line[:-2] if line.endswith(b"\r\n") else line
+        pieces = body.split(b"\r")
+        for piece in pieces[:-1]:
+            yield piece + b"\r"
+        last = pieces[-1] + line[len(body) :]
+        if last:
+            yield last
+
+
+def _chunks(
+    stream: IO[bytes], mask: int, min_lines: int, max_lines: int
+) -> Iterator[List[bytes]]:
+    # A line ends a chunk when its checksum matches the mask, so
+    # boundaries depend on content only and resynchronize shortly
+    # after any insertion or deletion
+    chunk: List[bytes] = []
+    for line in _lines(stream):
+        chunk.append(line)
+        if len(chunk) >= max_lines or (
+            len(chunk) >= min_lines and zlib.crc32(line) & mask == mask
+        ):
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate_chunk(chunk: List[bytes]) -> Tuple[int, ...]:
+    return tuple(
+        i
+        for i, line in enumerate(chunk)
+        if not ISRC.validate(line.decode("utf-8", "replace").rstrip("\r\n"))
+    )
+
+
+def validate_file(
+    path: Union[str, os.PathLike[str]],
+    cache: Union[str, os.PathLike[str], ChunkCache],
+    *,
+    mask_bits: int = 10,
+    min_lines: int = 64,
+    max_lines: int = 16384,
+) -> ValidationResult:
+    """Validates every line of file, reusing cached result where possible
+
+    Each line (with line ending stripped) is checked with
+    ``ISRC.validate()``. Lines end with LF, CR or CRLF, like reading
+    file in text mode. Result is identical to checking all lines
+    directly, but only chunks not seen before are actually validated.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        File containing one ISRC per line
+    cache : str, os.PathLike or `ChunkCache`
+        Cache object, or path of cache file. When a path is supplied,
+        cache is saved after validation.
+    mask_bits : int, optional
+        Controls average chunk size, which is roughly
+        ``min_lines + 2 ** mask_bits`` lines, as chunk boundaries are
+        only looked for after ``min_lines``
+    min_lines, max_lines : int, optional
+        Lower and upper bound of lines per chunk
+
+    Returns
+    -------
+    ValidationResult
+        Merged validation result of whole file
+    """
+    if not 0 < min_lines <= max_lines:
+        raise ValueError("Expect 0 < min_lines <= max_lines")
+    store = cache if isinstance(cache, ChunkCache) else ChunkCache(cache)
+    mask = (1 << mask_bits) - 1
+
+    total = chunks = reparsed = 0
+    invalid: List[int] = []
+    with open(path, "rb") as f:
+        for chunk in _chunks(f, mask, min_lines, max_lines):
+            h = hashlib.blake2b(digest_size=16)
+            for line in chunk:
+                h.update(line)
+            digest = h.hexdigest()
+            # Digest collision with differing line count is practically
+            # impossible, but is cheap to rule out
+            cached = store.get(digest)
+            if cached is None or cached[0] != len(chunk):
+                cached = (len(chunk), _validate_chunk(chunk))
+                store.put(digest, *cached)
+                reparsed += 1
+            invalid.extend(total + i for i in cached[1])
+            total += len(chunk)
+            chunks += 1
+
+    if store is not cache:
+        store.save()
+    return ValidationResult(total, tuple(invalid), chunks, reparsed)
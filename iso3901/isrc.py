@@ -3,7 +3,7 @@ from __future__ import annotations
 import enum
 from dataclasses import dataclass, field
 from datetime import date
-from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple, Type
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Tuple, Type, Union
 
 import iso3166
 
@@ -397,6 +397,42 @@ class Allocation(_AllocationType, enum.Enum):
 # fmt: on
 
 
+#
+# Packed integer form of ISRC. Each registrant character is a base-36
+# digit (0-9 before A-Z), followed by 2 decimal digits of year and 5 of
+# designation. Numeric order of packed keys is therefore the same as
+# lexical order of canonical ISRC strings, and the largest key
+# (about 6.05e14) fits comfortably in signed 64-bit integer.
+#
+_ALNUM = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_ALNUM_INDEX = {c: i for i, c in enumerate(_ALNUM)}
+_PACK_MAX = 36**5 * 100 * 100000
+
+
+def _pack(owner: str, year: int, designation: int) -> int:
+    if len(owner) != 5 or not (0 <= year < 100 and 0 <= designation < 100000):
+        raise ValueError("ISRC segments out of range for packing")
+    try:
+        n = 0
+        for c in owner:
+            n = n * 36 + _ALNUM_INDEX[c]
+    except KeyError:
+        raise ValueError(f'Registrant "{owner}" is not uppercase alphanumeric')
+    return (n * 100 + year) * 100000 + designation
+
+
+def _unpack(key: int) -> Tuple[str, int, int]:
+    if not 0 <= key < _PACK_MAX:
+        raise ValueError(f"Packed ISRC key {key} out of range")
+    key, designation = divmod(key, 100000)
+    n, year = divmod(key, 100)
+    chars = []
+    for _ in range(5):
+        n, r = divmod(n, 36)
+        chars.append(_ALNUM[r])
+    return ("".join(reversed(chars)), year, designation)
+
+
 @dataclass(frozen=True)
 class ISRC:
     """Objectified ISRC structure defined in ISO 3901:2019
@@ -491,6 +527,63 @@ class ISRC:
             "{:05d}".format(self.designation),
         ])
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Pickle as packed key where possible, which is much smaller
+        # than default dataclass pickling of class and all fields
+        try:
+            data: Union[int, Tuple[str, int, int]] = self.pack()
+        except ValueError:
+            data = (self.owner, self.year, self.designation)
+        if type(self) is not ISRC:
+            return (_restore, (data, self.raw, type(self)))
+        if self.raw is not None:
+            return (_restore, (data, self.raw))
+        return (_restore, (data,))
+
+    def pack(self) -> int:
+        """Encode ISRC as a single integer key
+
+        Keys sort in the same order as canonical ISRC strings, and fit
+        within signed 64-bit integer, which makes them suitable for
+        compact storage and comparison.
+
+        Raises
+        ------
+        ValueError
+            If ISRC is manually constructed with segments that can't
+            be encoded, such as lowercase or overlong registrant code
+
+        Returns
+        -------
+        int
+            Non-negative integer key
+        """
+        return _pack(self.owner, self.year, self.designation)
+
+    @classmethod
+    def unpack(cls: Type[ISRC], key: int) -> ISRC:
+        """Decode integer key produced by `pack()` method
+
+        Prefix allocation is not checked; the ``raw`` attribute of result
+        is always None.
+
+        Parameters
+        ----------
+        key : int
+            Packed ISRC integer
+
+        Raises
+        ------
+        ValueError
+            If key is out of range
+
+        Returns
+        -------
+        ISRC
+            The decoded ISRC object
+        """
+        return cls(*_unpack(key))
+
     @classmethod
     def _parse(cls, _raw: str) -> Tuple[str, int, int]:
         if not TYPE_CHECKING:
@@ -598,3 +691,14 @@ class ISRC:
             return False
         else:
             return True
+
+
+def _restore(
+    data: Union[int, Tuple[str, int, int]],
+    raw: Optional[str] = None,
+    cls: Type[ISRC] = ISRC,
+) -> ISRC:
+    result = cls.unpack(data) if isinstance(data, int) else cls(*data)
+    if raw is not None:
+        object.__setattr__(result, "raw", raw)
+    return result
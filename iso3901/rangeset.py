@@ -0,0 +1,279 @@
+"""Run-length encoded set of ISRC"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Tuple, Type, TypeVar
+
+from .isrc import _PACK_MAX, ISRC, _pack, _unpack
+
+__all__ = ("ISRCRangeSet",)
+
+_T = TypeVar("_T", bound="ISRCRangeSet")
+_Run = Tuple[str, int, int, int]
+
+_FORMAT_VERSION = 1
+_BLOCK = 100000  # number of designations within same owner and year
+
+
+def _coalesce(intervals: Iterable[Tuple[int, int]]) -> Tuple[array[int], array[int]]:
+    # Intervals must be sorted by start. Overlapping or adjacent
+    # ones are combined.
+    starts: array[int] = array("q")
+    ends: array[int] = array("q")
+    for s, e in intervals:
+        if ends and s <= ends[-1] + 1:
+            if e > ends[-1]:
+                ends[-1] = e
+        else:
+            starts.append(s)
+            ends.append(e)
+    return starts, ends
+
+
+def _put_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        try:
+            b = data[pos]
+        except IndexError:
+            raise ValueError("Truncated ISRCRangeSet data")
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+class ISRCRangeSet:
+    """Immutable set of ISRC, stored as runs of consecutive designations
+
+    Registrants usually issue designations sequentially, so storing runs
+    instead of individual codes saves a lot of space. Internally each run
+    is an inclusive interval of packed keys (see ``ISRC.pack()``), and all
+    set operations cost proportional to number of runs rather than number
+    of codes.
+
+    Supports ``in``, ``len()``, iteration in ascending order, equality,
+    and set operators ``|``, ``&`` and ``-``.
+
+    Parameters
+    ----------
+    codes : iterable of `ISRC`, optional
+        ISRC objects in any order; duplicates are allowed
+
+    Raises
+    ------
+    ValueError
+        If any ISRC can't be packed, see ``ISRC.pack()``
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    _starts: array[int]
+    _ends: array[int]
+
+    def __init__(self, codes: Iterable[ISRC] = ()) -> None:
+        keys = sorted(c.pack() for c in codes)
+        self._starts, self._ends = _coalesce(zip(keys, keys))
+
+    @classmethod
+    def _from_intervals(cls: Type[_T], intervals: Iterable[Tuple[int, int]]) -> _T:
+        obj = cls.__new__(cls)
+        obj._starts, obj._ends = _coalesce(intervals)
+        return obj
+
+    @classmethod
+    def from_runs(cls: Type[_T], runs: Iterable[_Run]) -> _T:
+        """Creates set from runs of designations
+
+        Parameters
+        ----------
+        runs : iterable of tuple
+            Each item is ``(owner, year, start, end)`` tuple, where
+            ``start`` and ``end`` are first and last designation of run
+            (inclusive). Runs can be unsorted and overlapping.
+
+        Raises
+        ------
+        ValueError
+            If any run is empty or can't be packed
+
+        Returns
+        -------
+        ISRCRangeSet
+            The resulting set
+        """
+        intervals: List[Tuple[int, int]] = []
+        for owner, year, start, end in runs:
+            if start > end:
+                raise ValueError(f"Empty run {start}..{end} for {owner}-{year:02d}")
+            intervals.append((_pack(owner, year, start), _pack(owner, year, end)))
+        intervals.sort()
+        return cls._from_intervals(intervals)
+
+    def runs(self) -> Iterator[_Run]:
+        """Yields runs of consecutive designations in ascending order
+
+        Yields
+        ------
+        tuple
+            ``(owner, year, start, end)`` tuple, with ``start`` and ``end``
+            designation inclusive
+        """
+        for s, e in zip(self._starts, self._ends):
+            while s <= e:
+                stop = min(e, s - s % _BLOCK + _BLOCK - 1)
+                owner, year, start = _unpack(s)
+                yield (owner, year, start, stop % _BLOCK)
+                s = stop + 1
+
+    def _intervals(self) -> Iterator[Tuple[int, int]]:
+        return zip(self._starts, self._ends)
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, ISRC):
+            return False
+        try:
+            key = item.pack()
+        except ValueError:
+            return False
+        i = bisect_right(self._starts, key) - 1
+        return i >= 0 and key <= self._ends[i]
+
+    def __len__(self) -> int:
+        return sum(self._ends) - sum(self._starts) + len(self._starts)
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def __iter__(self) -> Iterator[ISRC]:
+        for s, e in self._intervals():
+            for key in range(s, e + 1):
+                yield ISRC.unpack(key)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ISRCRangeSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __hash__(self) -> int:
+        return hash((self._starts.tobytes(), self._ends.tobytes()))
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {len(self._starts)} runs, {len(self)} codes>"
+
+    def union(self: _T, other: ISRCRangeSet) -> _T:
+        return self._from_intervals(heapq.merge(self._intervals(), other._intervals()))
+
+    def intersection(self: _T, other: ISRCRangeSet) -> _T:
+        a_s, a_e, b_s, b_e = self._starts, self._ends, other._starts, other._ends
+        result: List[Tuple[int, int]] = []
+        i = j = 0
+        while i < len(a_s) and j < len(b_s):
+            lo = max(a_s[i], b_s[j])
+            hi = min(a_e[i], b_e[j])
+            if lo <= hi:
+                result.append((lo, hi))
+            if a_e[i] < b_e[j]:
+                i += 1
+            else:
+                j += 1
+        return self._from_intervals(result)
+
+    def difference(self: _T, other: ISRCRangeSet) -> _T:
+        b_s, b_e = other._starts, other._ends
+        result: List[Tuple[int, int]] = []
+        j = 0
+        for s, e in self._intervals():
+            while j < len(b_s) and b_e[j] < s:
+                j += 1
+            k = j
+            while k < len(b_s) and b_s[k] <= e:
+                if b_s[k] > s:
+                    result.append((s, b_s[k] - 1))
+                s = max(s, b_e[k] + 1)
+                if s > e:
+                    break
+                k += 1
+            if s <= e:
+                result.append((s, e))
+        return self._from_intervals(result)
+
+    def __or__(self: _T, other: ISRCRangeSet) -> _T:
+        if not isinstance(other, ISRCRangeSet):
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self: _T, other: ISRCRangeSet) -> _T:
+        if not isinstance(other, ISRCRangeSet):
+            return NotImplemented
+        return self.intersection(other)
+
+    def __sub__(self: _T, other: ISRCRangeSet) -> _T:
+        if not isinstance(other, ISRCRangeSet):
+            return NotImplemented
+        return self.difference(other)
+
+    def to_bytes(self) -> bytes:
+        """Serializes set into compact binary form
+
+        Each run is stored as varint-encoded gap from previous run and
+        run length, so typical catalogs take a few bytes per run.
+
+        Returns
+        -------
+        bytes
+            Data which can be restored with `from_bytes()`
+        """
+        out = bytearray([_FORMAT_VERSION])
+        _put_varint(out, len(self._starts))
+        prev = -1
+        for s, e in self._intervals():
+            _put_varint(out, s - prev - 1)
+            _put_varint(out, e - s)
+            prev = e
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls: Type[_T], data: bytes) -> _T:
+        """Restores set serialized with `to_bytes()`
+
+        Parameters
+        ----------
+        data : bytes
+            Serialized data
+
+        Raises
+        ------
+        ValueError
+            If data is malformed
+
+        Returns
+        -------
+        ISRCRangeSet
+            The restored set
+        """
+        if not data or data[0] != _FORMAT_VERSION:
+            raise ValueError("Unsupported ISRCRangeSet data format")
+        count, pos = _get_varint(data, 1)
+        intervals: List[Tuple[int, int]] = []
+        prev = -1
+        for _ in range(count):
+            gap, pos = _get_varint(data, pos)
+            length, pos = _get_varint(data, pos)
+            s = prev + gap + 1
+            prev = s + length
+            intervals.append((s, prev))
+        if pos != len(data) or (intervals and prev >= _PACK_MAX):
+            raise ValueError("Malformed ISRCRangeSet data")
+        return cls._from_intervals(intervals)
@@ -0,0 +1,304 @@
+"""Disk-backed reconciliation of two huge ISRC listings
+
+Both inputs are parsed and normalized into packed integer keys (see
+``ISRC.pack()``). Keys are sorted in memory-bounded runs, spilled to
+temporary files when the budget is exceeded, then k-way merged (in
+several passes if there are many runs) so that codes present in either
+or both listings are streamed out in sorted order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import os
+import tempfile
+from array import array
+from typing import (
+    IO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .isrc import _PACK_MAX, ISRC, _pack
+
+__all__ = ("ReconcileStats", "reconcile")
+
+Sink = Callable[[ISRC], object]
+
+# Approximate memory cost of one buffered key, including transient
+# python int objects and list slot created while sorting a run
+_KEY_COST = 48
+_KEY_SIZE = 8
+
+# Maximum number of runs merged at once
+_FAN_IN = 64
+
+
+class ReconcileStats(NamedTuple):
+    """Summary of reconciliation
+
+    Attributes
+    ----------
+    only_a, only_b : int
+        Number of distinct codes only found in one side
+    both : int
+        Number of distinct codes found in both sides
+    dup_a, dup_b : int
+        Number of distinct codes occurring more than once within one side
+    invalid_a, invalid_b : int
+        Number of lines which can't be parsed as ISRC
+    """
+
+    only_a: int
+    only_b: int
+    both: int
+    dup_a: int
+    dup_b: int
+    invalid_a: int
+    invalid_b: int
+
+
+class _ExternalSorter:
+    """Collects integer keys, spilling sorted runs to disk when full
+
+    Runs are kept as closed files in a temporary directory. When there
+    are more runs than `_FAN_IN`, they are merged in several passes, so
+    at most `_FAN_IN` files are open at any time, and read buffers of a
+    merge fit within the budget.
+    """
+
+    def __init__(self, budget: int, tmpdir: Optional[str]) -> None:
+        self.limit = max(1, budget // _KEY_COST)
+        self.block = max(1, budget // _KEY_SIZE // (_FAN_IN + 1))
+        self.tmpdir = tmpdir
+        self.invalid = 0
+        self._buf = array("q")
+        self._dir: Optional[tempfile.TemporaryDirectory[str]] = None
+        self._runs: List[str] = []
+        self._serial = 0
+
+    def feed(self, lines: Iterable[str]) -> None:
+        buf = self._buf
+        for line in lines:
+            try:
+                buf.append(_pack(*ISRC._parse(line.strip())))
+            except ValueError:
+                self.invalid += 1
+                continue
+            if len(buf) >= self.limit:
+                self._spill()
+                buf = self._buf
+
+    def _new_run(self) -> str:
+        if self._dir is None:
+            self._dir = tempfile.TemporaryDirectory(prefix="iso3901-", dir=self.tmpdir)
+        self._serial += 1
+        return os.path.join(self._dir.name, f"{self._serial}.run")
+
+    def _spill(self) -> None:
+        path = self._new_run()
+        with open(path, "wb") as f:
+            array("q", sorted(self._buf)).tofile(f)
+        self._runs.append(path)
+        self._buf = array("q")
+
+    def _read_run(self, path: str) -> Iterator[int]:
+        with open(path, "rb") as f:
+            while True:
+                chunk = array("q")
+                try:
+                    chunk.fromfile(f, self.block)
+                except EOFError:
+                    pass  # partially filled chunk is still usable
+                if not chunk:
+                    return
+                yield from chunk
+
+    def _merge_runs(self, paths: List[str]) -> str:
+        path = self._new_run()
+        with open(path, "wb") as f:
+            out = array("q")
+            for key in heapq.merge(*(self._read_run(p) for p in paths)):
+                out.append(key)
+                if len(out) >= self.block:
+                    out.tofile(f)
+                    out = array("q")
+            out.tofile(f)
+        for p in paths:
+            os.remove(p)
+        return path
+
+    def merged(self) -> Iterator[int]:
+        """Yields all collected keys in ascending order"""
+        if not self._runs:
+            yield from sorted(self._buf)
+            return
+        if self._buf:
+            self._spill()
+        while len(self._runs) > _FAN_IN:
+            runs = self._runs
+            groups = [runs[i : i + _FAN_IN] for i in range(0, len(runs), _FAN_IN)]
+            self._runs = [g[0] if len(g) == 1 else self._merge_runs(g) for g in groups]
+        yield from heapq.merge(*(self._read_run(p) for p in self._runs))
+
+    def close(self) -> None:
+        if self._dir is not None:
+            self._dir.cleanup()
+            self._dir = None
+        self._runs.clear()
+        self._buf = array("q")
+
+
+def _grouped(keys: Iterator[int]) -> Iterator[Tuple[int, int]]:
+    # Collapse sorted keys into (key, occurrence) pairs
+    prev, count = -1, 0
+    for key in keys:
+        if key == prev:
+            count += 1
+            continue
+        if count:
+            yield prev, count
+        prev, count = key, 1
+    if count:
+        yield prev, count
+
+
+# Sentinel sorting after every valid key
+_END = (_PACK_MAX, 0)
+
+
+def _emit(sink: Optional[Sink], key: int) -> None:
+    if sink is not None:
+        sink(ISRC.unpack(key))
+
+
+def reconcile(
+    a: Iterable[str],
+    b: Iterable[str],
+    *,
+    only_a: Optional[Sink] = None,
+    only_b: Optional[Sink] = None,
+    both: Optional[Sink] = None,
+    dup_a: Optional[Sink] = None,
+    dup_b: Optional[Sink] = None,
+    memory: int = 64 * 1024 * 1024,
+    tmpdir: Optional[str] = None,
+) -> ReconcileStats:
+    """Compares two ISRC listings without holding them in memory
+
+    Each line of input is stripped of surrounding whitespace and parsed
+    with ``ISRC.parse()`` rules; unparseable lines are counted and
+    skipped. Every distinct code is sent to exactly one of ``only_a``,
+    ``only_b`` or ``both`` sinks, in ascending order. Codes occurring
+    more than once within one side are additionally sent to ``dup_a`` or
+    ``dup_b`` once.
+
+    Parameters
+    ----------
+    a, b : iterable of str
+        ISRC listings, such as text files opened for reading
+    only_a, only_b, both, dup_a, dup_b : callable, optional
+        Sinks receiving `ISRC` objects. Results are only counted if
+        corresponding sink is omitted.
+    memory : int, optional
+        Approximate memory budget in bytes, shared by both sides.
+        Defaults to 64 MiB.
+    tmpdir : str, optional
+        Directory for temporary sorted runs
+
+    Returns
+    -------
+    ReconcileStats
+        Counts of each category
+    """
+    sides = [_ExternalSorter(memory // 2, tmpdir) for _ in range(2)]
+    try:
+        sides[0].feed(a)
+        sides[1].feed(b)
+        counts = [0] * 5
+        stream_a = _grouped(sides[0].merged())
+        stream_b = _grouped(sides[1].merged())
+        item_a = next(stream_a, _END)
+        item_b = next(stream_b, _END)
+        while item_a is not _END or item_b is not _END:
+            key = min(item_a[0], item_b[0])
+            if item_a[0] != key:
+                _emit(only_b, key)
+                counts[1] += 1
+            elif item_b[0] != key:
+                _emit(only_a, key)
+                counts[0] += 1
+            else:
+                _emit(both, key)
+                counts[2] += 1
+            if item_a[0] == key:
+                if item_a[1] > 1:
+                    _emit(dup_a, key)
+                    counts[3] += 1
+                item_a = next(stream_a, _END)
+            if item_b[0] == key:
+                if item_b[1] > 1:
+                    _emit(dup_b, key)
+                    counts[4] += 1
+                item_b = next(stream_b, _END)
+        counts += [sides[0].invalid, sides[1].invalid]
+        return ReconcileStats._make(counts)
+    finally:
+        for side in sides:
+            side.close()
+
+
+def _writer(f: IO[str]) -> Sink:
+    return lambda isrc: f.write(f"{isrc}\n")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m iso3901.reconcile",
+        description="Reconcile two ISRC listings, one code per line",
+    )
+    parser.add_argument("a", help="first listing")
+    parser.add_argument("b", help="second listing")
+    parser.add_argument("-o", "--outdir", default=".", help="output directory")
+    parser.add_argument(
+        "-m", "--memory", type=int, default=64, help="memory budget in MiB"
+    )
+    parser.add_argument("-t", "--tmpdir", help="directory for temporary files")
+    args = parser.parse_args(argv)
+
+    names = ("only_a", "only_b", "both", "dup_a", "dup_b")
+    outputs = [
+        open(os.path.join(args.outdir, f"{name}.txt"), "w", encoding="ascii")
+        for name in names
+    ]
+    sinks = [_writer(f) for f in outputs]
+    try:
+        with open(args.a, encoding="utf-8") as fa:
+            with open(args.b, encoding="utf-8") as fb:
+                stats = reconcile(
+                    fa,
+                    fb,
+                    only_a=sinks[0],
+                    only_b=sinks[1],
+                    both=sinks[2],
+                    dup_a=sinks[3],
+                    dup_b=sinks[4],
+                    memory=args.memory * 1024 * 1024,
+                    tmpdir=args.tmpdir,
+                )
+    finally:
+        for f in outputs:
+            f.close()
+    for field, value in zip(stats._fields, stats):
+        print(f"{field}: {value}")
+
+
+if __name__ == "__main__":
+    main()
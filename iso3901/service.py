@@ -0,0 +1,352 @@
+"""Local HTTP/JSON validation service, using asyncio only
+
+Endpoints
+---------
+``POST /validate``
+    Body ``{"isrc": "..."}``, returns a single result object
+``POST /validate/batch``
+    Body ``{"isrcs": ["...", ...]}``, returns ``{"results": [...]}``
+``GET /stats``
+    Request count, micro-batch count and latency percentiles
+
+Each result object contains ``valid`` key. Valid ones also contain
+``isrc`` (canonical compact form), ``prefix``, ``agency``, ``year`` and
+``designation``; invalid ones contain ``error`` message instead.
+
+Concurrent single requests are coalesced into micro-batches before
+parsing, and total number of ISRC in flight is capped; requests beyond
+the cap are rejected with status 503.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from .isrc import ISRC
+
+__all__ = ("ValidationService", "check")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+def check(raw: object) -> Dict[str, Any]:
+    """Validates string and returns JSON-serializable result
+
+    Parameters
+    ----------
+    raw : object
+        Item to be validated; anything other than string is invalid
+
+    Returns
+    -------
+    dict
+        Result object as described in module documentation
+    """
+    if not isinstance(raw, str):
+        return {"valid": False, "error": "Argument must be a string"}
+    try:
+        isrc = ISRC.parse(raw)
+    except ValueError as e:
+        return {"valid": False, "error": str(e)}
+    return {
+        "valid": True,
+        "isrc": str(isrc),
+        "prefix": isrc.prefix,
+        "agency": isrc.agency,
+        "year": isrc.year,
+        "designation": isrc.designation,
+    }
+
+
+class _Batcher:
+    """Collects concurrently submitted strings and validates them together"""
+
+    def __init__(self, max_batch: int, max_delay: float) -> None:
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self._queue: asyncio.Queue[Tuple[str, asyncio.Future[Dict[str, Any]]]] = (
+            asyncio.Queue()
+        )
+        self._task = asyncio.ensure_future(self._run())
+
+    async def submit(self, raw: str) -> Dict[str, Any]:
+        fut: asyncio.Future[Dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((raw, fut))
+        return await fut
+
+    def _drain(self, batch: List[Tuple[str, asyncio.Future[Dict[str, Any]]]]) -> None:
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            self._drain(batch)
+            # Only linger for more submissions when there is already
+            # concurrent load, so that a lone request is not delayed
+            if 1 < len(batch) < self.max_batch and self.max_delay > 0:
+                await asyncio.sleep(self.max_delay)
+                self._drain(batch)
+            self.batches += 1
+            for raw, fut in batch:
+                if not fut.done():
+                    fut.set_result(check(raw))
+
+    async def close(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class ValidationService:
+    """HTTP/JSON server exposing ISRC validation
+
+    Parameters
+    ----------
+    host : str, optional
+        Address to listen on. Defaults to localhost only.
+    port : int, optional
+        Port to listen on. Defaults to 0, meaning any free port; check
+        `address` property after `start()`.
+    max_batch : int, optional
+        Maximum number of single requests coalesced into one micro-batch
+    max_delay : float, optional
+        Seconds to wait for more requests before processing a micro-batch.
+        Only applies when other requests are already waiting.
+    max_inflight : int, optional
+        Maximum number of ISRC being processed at any moment
+    max_body : int, optional
+        Maximum request body size in bytes
+    latency_window : int, optional
+        Number of most recent requests used for latency percentiles
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        max_batch: int = 256,
+        max_delay: float = 0.001,
+        max_inflight: int = 10000,
+        max_body: int = 1024 * 1024,
+        latency_window: int = 10000,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_inflight = max_inflight
+        self.max_body = max_body
+        self.requests = 0
+        self._inflight = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._server: Optional[asyncio.Server] = None
+        self._batcher: Optional[_Batcher] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        """Starts listening for connections"""
+        self._batcher = _Batcher(self.max_batch, self.max_delay)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def close(self) -> None:
+        """Stops server, closing all client connections"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._batcher is not None:
+            await self._batcher.close()
+            self._batcher = None
+
+    async def __aenter__(self) -> ValidationService:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host and port server is listening on"""
+        if self._server is None or not self._server.sockets:
+            raise RuntimeError("Server is not started")
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return (host, port)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns request statistics, including latency percentiles
+        in milliseconds"""
+        samples = sorted(self._latencies)
+        latency: Dict[str, Optional[float]] = {}
+        for p in (50, 90, 99):
+            if samples:
+                rank = max(0, math.ceil(p / 100 * len(samples)) - 1)
+                latency[f"p{p}"] = round(samples[rank] * 1000, 3)
+            else:
+                latency[f"p{p}"] = None
+        return {
+            "requests": self.requests,
+            "batches": self._batcher.batches if self._batcher else 0,
+            "inflight": self._inflight,
+            "latency_ms": latency,
+        }
+
+    async def _dispatch(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[int, Dict[str, Any]]:
+        if path == "/stats":
+            if method != "GET":
+                return 405, {"error": "Use GET method"}
+            return 200, self.stats()
+        if path not in ("/validate", "/validate/batch"):
+            return 404, {"error": f"Unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST method"}
+        try:
+            data = json.loads(body)
+        except (RecursionError, ValueError):
+            return 400, {"error": "Body is not valid JSON"}
+
+        if path == "/validate":
+            if not isinstance(data, dict) or "isrc" not in data:
+                return 400, {"error": 'Expect object with "isrc" key'}
+            items: List[Any] = [data["isrc"]]
+        else:
+            if not isinstance(data, dict) or not isinstance(data.get("isrcs"), list):
+                return 400, {"error": 'Expect object with "isrcs" list'}
+            items = data["isrcs"]
+
+        if self._inflight + len(items) > self.max_inflight:
+            return 503, {"error": "Too many requests in flight"}
+        assert self._batcher is not None
+        self._inflight += len(items)
+        try:
+            if path == "/validate":
+                raw = items[0]
+                if isinstance(raw, str):
+                    return 200, await self._batcher.submit(raw)
+                return 200, check(raw)
+            # Batch requests are already batched, so they are parsed
+            # directly, yielding to other requests between slices
+            results: List[Dict[str, Any]] = []
+            for i in range(0, len(items), self.max_batch):
+                if i:
+                    await asyncio.sleep(0)
+                results.extend(check(raw) for raw in items[i : i + self.max_batch])
+            return 200, {"results": results}
+        finally:
+            self._inflight -= len(items)
+
+    def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Dict[str, Any],
+        keep_alive: bool,
+    ) -> None:
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    method, path, version = line.decode("latin-1").split()
+                    headers: Dict[str, str] = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", "0"))
+                    if length < 0:
+                        raise ValueError("Negative content length")
+                except ValueError:
+                    self._respond(writer, 400, {"error": "Malformed request"}, False)
+                    break
+                if length > self.max_body:
+                    self._respond(writer, 413, {"error": "Body too large"}, False)
+                    break
+                body = await reader.readexactly(length)
+
+                start = time.perf_counter()
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                self._respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                self.requests += 1
+                self._latencies.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+async def _serve(host: str, port: int) -> None:
+    service = ValidationService(host, port)
+    await service.start()
+    print("Listening on {}:{}".format(*service.address))
+    await service.serve_forever()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m iso3901.service",
+        description="Run ISRC validation HTTP/JSON service",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="listening address")
+    parser.add_argument("-p", "--port", type=int, default=8080, help="listening port")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
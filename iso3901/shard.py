@@ -0,0 +1,181 @@
+"""Deterministic partitioning of ISRC streams into shards
+
+Shard numbers are derived from the packed ISRC encoding (see
+``ISRC.pack()``) with a fixed integer mixing function, so they are stable
+across processes, machines and python versions, unlike builtin `hash()`.
+"""
+
+from __future__ import annotations
+
+from typing import IO, Callable, Iterable, List, Optional, Sequence, Union
+
+from .isrc import ISRC
+
+__all__ = ("Partitioner", "shard_of")
+
+Sink = Union[IO[str], Callable[[List[ISRC]], object]]
+
+_MASK64 = (1 << 64) - 1
+_KEY_DIVISOR = {
+    "registrant": 100 * 100000,
+    "prefix": 36**3 * 100 * 100000,
+}
+
+
+def _mix(x: int) -> int:
+    # splitmix64 finalizer
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & _MASK64
+    return x ^ (x >> 31)
+
+
+def _shard(key: int, shards: int, divisor: int) -> int:
+    return _mix(key // divisor) % shards
+
+
+def shard_of(isrc: ISRC, shards: int, by: str = "registrant") -> int:
+    """Computes stable shard number of ISRC
+
+    Parameters
+    ----------
+    isrc : `ISRC`
+        The ISRC to be routed
+    shards : int
+        Total number of shards
+    by : str, optional
+        Either ``"registrant"`` (5-character owner code, default) or
+        ``"prefix"`` (first 2 letters). All ISRC sharing the same
+        registrant or prefix land in the same shard.
+
+    Raises
+    ------
+    ValueError
+        If ``by`` is unknown, number of shards is not positive, or ISRC
+        can't be packed
+
+    Returns
+    -------
+    int
+        Shard number, ranging from 0 to ``shards - 1``
+    """
+    if shards < 1:
+        raise ValueError("Number of shards must be positive")
+    try:
+        divisor = _KEY_DIVISOR[by]
+    except KeyError:
+        raise ValueError(f'Unknown sharding key "{by}"')
+    return _shard(isrc.pack(), shards, divisor)
+
+
+class Partitioner:
+    """Routes ISRC into sinks according to `shard_of()`
+
+    A sink can be a text file object, which receives canonical ISRC
+    strings one per line, or a callable receiving a list of `ISRC`
+    objects. Output is buffered per shard and delivered every
+    ``buffer_size`` items, so that many shards don't result in many
+    tiny writes. Use as context manager, or call `flush()` when done.
+    If a sink raises, its buffered items are kept and delivered again on
+    next attempt.
+
+    Parameters
+    ----------
+    sinks : sequence of file or callable
+        One sink per shard
+    by : str, optional
+        Sharding key, see `shard_of()`
+    buffer_size : int, optional
+        Number of ISRC buffered per shard before delivering to sink.
+        Use 1 to deliver immediately.
+    invalid : callable, optional
+        Receives every string fed into `feed()` which can't be parsed.
+        Invalid strings are only counted if omitted.
+
+    Attributes
+    ----------
+    counts : list of int
+        Number of ISRC routed to each shard
+    invalid_count : int
+        Number of unparseable strings
+    """
+
+    def __init__(
+        self,
+        sinks: Sequence[Sink],
+        *,
+        by: str = "registrant",
+        buffer_size: int = 1000,
+        invalid: Optional[Callable[[str], object]] = None,
+    ) -> None:
+        if not sinks:
+            raise ValueError("At least one sink is needed")
+        if buffer_size < 1:
+            raise ValueError("Buffer size must be positive")
+        try:
+            self._divisor = _KEY_DIVISOR[by]
+        except KeyError:
+            raise ValueError(f'Unknown sharding key "{by}"')
+        self.sinks = list(sinks)
+        self.buffer_size = buffer_size
+        self.invalid = invalid
+        self.counts = [0] * len(sinks)
+        self.invalid_count = 0
+        self._buffers: List[List[ISRC]] = [[] for _ in sinks]
+
+    def __enter__(self) -> Partitioner:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.flush()
+
+    def _route(self, isrc: ISRC, key: int) -> int:
+        shard = _shard(key, len(self.sinks), self._divisor)
+        buf = self._buffers[shard]
+        buf.append(isrc)
+        self.counts[shard] += 1
+        if len(buf) >= self.buffer_size:
+            self._deliver(shard)
+        return shard
+
+    def _deliver(self, shard: int) -> None:
+        buf = self._buffers[shard]
+        if not buf:
+            return
+        sink = self.sinks[shard]
+        if callable(sink):
+            sink(buf)
+        else:
+            sink.write("".join(f"{isrc}\n" for isrc in buf))
+        # Only discard buffer after successful delivery, so that
+        # nothing is lost if sink raises
+        self._buffers[shard] = []
+
+    def add(self, isrc: ISRC) -> int:
+        """Routes an ISRC object, returning its shard number
+
+        Raises
+        ------
+        ValueError
+            If ISRC can't be packed
+        """
+        return self._route(isrc, isrc.pack())
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Parses and routes strings, such as lines of a text file
+
+        Surrounding whitespace of each string is ignored.
+        """
+        for line in lines:
+            try:
+                isrc = ISRC.parse(line.strip())
+            except ValueError:
+                self.invalid_count += 1
+                if self.invalid is not None:
+                    self.invalid(line)
+                continue
+            self._route(isrc, isrc.pack())
+
+    def flush(self) -> None:
+        """Delivers all buffered ISRC to sinks"""
+        for shard in range(len(self.sinks)):
+            self._deliver(shard)
@@ -0,0 +1,129 @@
+"""SQLite integration for ISRC
+
+`register_adapters()` lets `ISRC` objects be stored as packed INTEGER
+keys (see ``ISRC.pack()``), which sort like ISRC strings and make
+compact indexes. Columns declared with ``ISRC`` type are converted back
+to `ISRC` objects when connection is opened with
+``detect_types=sqlite3.PARSE_DECLTYPES``.
+
+`register_functions()` adds following deterministic SQL functions to a
+connection, each accepting either ISRC text (also when stored as BLOB) or
+packed key, and returning NULL for NULL or invalid input (except
+``isrc_valid``):
+
+- ``isrc_valid(x)``: 1 if valid, otherwise 0
+- ``isrc_normalize(x)``: canonical compact form, like ``GBAJY1234567``
+- ``isrc_pack(x)``: packed integer key
+- ``isrc_prefix(x)``: first 2 letters
+- ``isrc_agency(x)``: name of allocation agency
+- ``isrc_year(x)``: 2-digit reference year, as integer
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Callable, Optional, Tuple, TypeVar, Union
+
+from .isrc import ISRC, Allocation, _pack, _unpack
+
+__all__ = ("register_adapters", "register_functions")
+
+_R = TypeVar("_R")
+
+
+def _segments(value: object) -> Optional[Tuple[str, int, int]]:
+    # Accepts ISRC text (also as BLOB) or packed key, applying the same
+    # rules as ISRC.parse() to all
+    if isinstance(value, bytes):
+        try:
+            value = value.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+    if isinstance(value, str):
+        try:
+            return ISRC._parse(value)
+        except ValueError:
+            return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        try:
+            segments = _unpack(value)
+        except ValueError:
+            return None
+        if segments[0][:2] not in Allocation.__members__:
+            return None
+        return segments
+    return None
+
+
+def _sql_function(
+    func: Callable[[Tuple[str, int, int]], _R],
+) -> Callable[[object], Optional[_R]]:
+    def wrapper(value: object) -> Optional[_R]:
+        segments = _segments(value)
+        return None if segments is None else func(segments)
+
+    return wrapper
+
+
+def _valid(value: object) -> Optional[int]:
+    if value is None:
+        return None
+    return 0 if _segments(value) is None else 1
+
+
+_FUNCTIONS = {
+    "isrc_normalize": _sql_function(lambda s: f"{s[0]}{s[1]:02d}{s[2]:05d}"),
+    "isrc_pack": _sql_function(lambda s: _pack(*s)),
+    "isrc_prefix": _sql_function(lambda s: s[0][:2]),
+    "isrc_agency": _sql_function(lambda s: Allocation[s[0][:2]].agency.value),
+    "isrc_year": _sql_function(lambda s: s[1]),
+}
+
+
+def _convert(value: bytes) -> Union[ISRC, int, str]:
+    # Columns may still hold legacy ISRC text instead of packed keys.
+    # Apply the same rules as SQL functions, so that a value converts
+    # into ISRC if and only if isrc_valid() holds for it.
+    raw: Union[int, str]
+    if value.lstrip(b"-").isdigit():
+        raw = int(value)
+    else:
+        raw = value.decode("utf-8", "replace")
+    segments = _segments(raw)
+    return raw if segments is None else ISRC(*segments)
+
+
+def register_adapters(typename: str = "ISRC") -> None:
+    """Registers global adapter and converter for `ISRC`
+
+    `ISRC` objects passed as query parameter are stored as packed
+    integer keys. Values of columns declared with ``typename`` type are
+    converted into `ISRC` when connection uses
+    ``detect_types=sqlite3.PARSE_DECLTYPES``. Such columns may also hold
+    ISRC text. A value is converted exactly when ``isrc_valid()`` holds
+    for it; other values, including integers which aren't keys of
+    allocated prefixes, are returned as plain integer or string, so that
+    they can be found and fixed.
+
+    Parameters
+    ----------
+    typename : str, optional
+        Declared column type to be converted. Defaults to ``ISRC``.
+    """
+    sqlite3.register_adapter(ISRC, ISRC.pack)
+    sqlite3.register_converter(typename, _convert)
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """Registers ISRC SQL functions on a connection
+
+    See module documentation for list of functions.
+
+    Parameters
+    ----------
+    conn : sqlite3.Connection
+        Connection to register functions on
+    """
+    conn.create_function("isrc_valid", 1, _valid, deterministic=True)
+    for name, func in _FUNCTIONS.items():
+        conn.create_function(name, 1, func, deterministic=True)
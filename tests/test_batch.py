@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+from typing import List, Optional
+
+import pytest
+
+from iso3901 import ISRC, ISRCBatch
+
+CODES = ["GB-AJY-12-34567", "bogus", "QMDA71418090", "XY-ZZZ-12-34567"]
+
+
+def test_pickle_isrc():
+    for isrc in (
+        ISRC.parse("ISRC GB-AJY-12-34567"),
+        ISRC("GBAJY", 12, 34567),
+        ISRC("Some Owner", 123, 456789),
+    ):
+        restored = pickle.loads(pickle.dumps(isrc))
+        assert restored == isrc
+        assert restored.raw == isrc.raw
+
+
+def test_pickle_isrc_compact():
+    isrc = ISRC("GBAJY", 12, 34567)
+    assert len(pickle.dumps(isrc)) < len(pickle.dumps(isrc.__dict__))
+
+
+def test_from_strings():
+    batch = ISRCBatch.from_strings(CODES)
+    assert len(batch) == 4
+    assert list(batch.valid) == [1, 0, 1, 0]
+    assert batch[0] == ISRC.parse(CODES[0])
+    assert batch[1] is None
+    assert list(batch) == [ISRC.parse(CODES[0]), None, ISRC.parse(CODES[2]), None]
+    assert [batch.prefix(i) for i in range(4)] == ["GB", None, "QM", None]
+    assert batch.codes[2] == ISRC.parse(CODES[2]).pack()
+
+
+def test_from_isrcs():
+    items = [ISRC("GBAJY", 12, 34567), ISRC("XYZZZ", 1, 1), ISRC("Some Owner", 1, 1)]
+    batch = ISRCBatch.from_isrcs(items)
+    assert list(batch) == [items[0], None, None]
+
+
+def test_pickle_batch():
+    batch = ISRCBatch.from_strings(CODES)
+    restored = pickle.loads(pickle.dumps(batch))
+    assert list(restored) == list(batch)
+
+
+def test_bad_buffer():
+    with pytest.raises(ValueError):
+        ISRCBatch(b"ISRCBAT1")
+    with pytest.raises(ValueError):
+        ISRCBatch(bytes(32))
+
+
+def _worker(name: str) -> List[Optional[ISRC]]:
+    with ISRCBatch.attach(name) as batch:
+        return list(batch)
+
+
+def test_shared_memory():
+    with ISRCBatch.from_strings(CODES, shared=True) as batch:
+        try:
+            assert batch.shm_name is not None
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(1) as pool:
+                assert pool.apply(_worker, (batch.shm_name,)) == list(batch)
+            attached = pickle.loads(pickle.dumps(batch))
+            assert attached.shm_name == batch.shm_name
+            attached.codes[0] = 0
+            assert batch.codes[0] == 0
+            attached.close()
+        finally:
+            batch.unlink()
+
+
+def test_close_with_buffer_view():
+    batch = ISRCBatch.from_strings(CODES, shared=True)
+    try:
+        with batch.buffer as view:
+            data = bytes(view)
+        batch.close()
+        attached = ISRCBatch.attach(batch.shm_name)
+        view = attached.buffer
+        assert bytes(view) == data
+        with pytest.raises(BufferError):
+            attached.close()
+        view.release()
+        attached.close()
+    finally:
+        batch.unlink()
+
+
+def test_attach_from_unrelated_process():
+    from multiprocessing import shared_memory
+
+    with ISRCBatch.from_strings(CODES, shared=True) as batch:
+        try:
+            script = (
+                "import sys; from iso3901 import ISRCBatch; "
+                "b = ISRCBatch.attach(sys.argv[1]); print(b[0]); b.close()"
+            )
+            proc = subprocess.run(
+                [sys.executable, "-c", script, str(batch.shm_name)],
+                capture_output=True,
+                text=True,
+                check=True,
+                env={**os.environ, "PYTHONWARNINGS": "always"},
+            )
+            assert proc.stdout.strip() == "GBAJY1234567"
+            assert "leaked" not in proc.stderr
+            # Segment must survive exit of attaching process
+            shared_memory.SharedMemory(batch.shm_name).close()
+        finally:
+            batch.unlink()
+
+
+@pytest.mark.parametrize(
+    "factory, items",
+    [
+        (ISRCBatch.from_strings, ["ZZZZZ1234567", 1]),
+        (ISRCBatch.from_isrcs, [ISRC("ZZZZZ", 12, 34567), "ZZZZZ1234567"]),
+    ],
+)
+def test_no_leak_on_failure(monkeypatch: pytest.MonkeyPatch, factory, items):
+    from multiprocessing import shared_memory
+
+    created: List[str] = []
+
+    class Recorder(shared_memory.SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self.name)
+
+    monkeypatch.setattr(shared_memory, "SharedMemory", Recorder)
+    with pytest.raises((TypeError, AttributeError)):
+        factory(items, shared=True)
+    monkeypatch.undo()
+    assert len(created) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(created[0])
+
+
+def test_lazy_multiprocessing_import():
+    script = "import sys, iso3901; print('multiprocessing' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "False"
@@ -0,0 +1,130 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from iso3901 import ISRC
+from iso3901.incremental import ChunkCache, validate_file
+
+
+def _make_lines(count: int) -> List[str]:
+    lines = [f"ZZ-ZZZ-12-{i:05d}" for i in range(count)]
+    for i in range(0, count, 37):
+        lines[i] = f"XY-ZZZ-12-{i:05d}"
+    return lines
+
+
+def _full_run(lines: List[str]):
+    return tuple(i for i, line in enumerate(lines) if not ISRC.validate(line))
+
+
+def _write(path: Path, lines: List[str]) -> None:
+    path.write_text("".join(line + "\n" for line in lines))
+
+
+def test_matches_full_run(tmp_path: Path):
+    lines = _make_lines(5000)
+    src = tmp_path / "catalog.txt"
+    _write(src, lines)
+
+    result = validate_file(src, tmp_path / "cache.json", mask_bits=5, min_lines=8)
+    assert result.lines == len(lines)
+    assert result.invalid == _full_run(lines)
+    assert result.reparsed == result.chunks
+
+
+def test_only_changed_chunks_reparsed(tmp_path: Path):
+    lines = _make_lines(5000)
+    src = tmp_path / "catalog.txt"
+    cache = tmp_path / "cache.json"
+    _write(src, lines)
+    first = validate_file(src, cache, mask_bits=5, min_lines=8)
+
+    lines[2500] = "not an isrc"
+    lines.insert(100, "ZZ-ZZZ-99-99999")
+    _write(src, lines)
+    second = validate_file(src, cache, mask_bits=5, min_lines=8)
+    assert second.invalid == _full_run(lines)
+    assert 0 < second.reparsed <= 4
+    assert second.chunks >= first.chunks
+
+
+def test_cache_keyed_by_db_date(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from datetime import date
+
+    import iso3901.incremental
+
+    src = tmp_path / "catalog.txt"
+    _write(src, _make_lines(500))
+    cache = ChunkCache(tmp_path / "cache.json")
+    validate_file(src, cache, mask_bits=4, min_lines=4)
+    assert validate_file(src, cache, mask_bits=4, min_lines=4).reparsed == 0
+
+    monkeypatch.setattr(iso3901.incremental, "DB_DATE", date(2099, 1, 1))
+    again = validate_file(src, cache, mask_bits=4, min_lines=4)
+    assert again.reparsed == again.chunks
+
+
+def test_cache_persisted(tmp_path: Path):
+    src = tmp_path / "catalog.txt"
+    _write(src, _make_lines(500))
+    validate_file(src, tmp_path / "cache.json", mask_bits=4, min_lines=4)
+    assert len(ChunkCache(tmp_path / "cache.json")) > 0
+    again = validate_file(src, tmp_path / "cache.json", mask_bits=4, min_lines=4)
+    assert again.reparsed == 0
+
+
+def test_stale_chunks_pruned(tmp_path: Path):
+    lines = _make_lines(5000)
+    src = tmp_path / "catalog.txt"
+    cache = tmp_path / "cache.json"
+    _write(src, lines)
+    first = validate_file(src, cache, mask_bits=5, min_lines=8)
+    for night in range(5):
+        for i in range(night * 7, 5000, 500):
+            lines[i] = f"ZZ-ZZZ-13-{night:05d}"
+        _write(src, lines)
+        result = validate_file(src, cache, mask_bits=5, min_lines=8)
+        assert result.invalid == _full_run(lines)
+    assert len(ChunkCache(cache)) == result.chunks
+    assert len(ChunkCache(cache)) <= first.chunks + 10
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"version": 1}',
+        '{"version": 1, "chunks": []}',
+        '{"version": 1, "chunks": {"k": 5}}',
+        '{"version": 1, "chunks": {"k": [1, ["x"]]}}',
+        "[1, 2]",
+        "not json",
+    ],
+)
+def test_malformed_cache(tmp_path: Path, content: str):
+    (tmp_path / "cache.json").write_text(content)
+    assert len(ChunkCache(tmp_path / "cache.json")) == 0
+    src = tmp_path / "catalog.txt"
+    lines = _make_lines(100)
+    _write(src, lines)
+    result = validate_file(src, tmp_path / "cache.json")
+    assert result.invalid == _full_run(lines)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"GBAJY1234567\r\nbogus\rGBAJY1234567\nXX",
+        b"\r\r\n\rGBAJY1234567\r",
+        b"a\rb\r\nc\n\r\n",
+    ],
+)
+def test_line_endings(tmp_path: Path, content: bytes):
+    src = tmp_path / "catalog.txt"
+    src.write_bytes(content)
+    with open(src, encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f]
+    for min_lines in (1, 64):
+        result = validate_file(src, tmp_path / "cache.json", min_lines=min_lines)
+        assert result.lines == len(lines)
+        assert result.invalid == _full_run(lines)
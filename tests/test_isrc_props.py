@@ -68,3 +68,34 @@ def test_bad_isrc_construct():
     isrc_bad = ISRC("QX123", 45, 67890)
     assert isrc_bad.country is None
     assert isrc_bad.agency is None
+
+
+@pytest.mark.parametrize(
+    "code",
+    ["ZZZZZ1234567", "AD0000000000", "ZZZZZ9999999", "GBAJY1200001"],
+)
+def test_pack_round_trip(code: str):
+    isrc = ISRC.parse(code)
+    key = isrc.pack()
+    assert 0 <= key < 2**63
+    assert ISRC.unpack(key) == isrc
+
+
+def test_pack_order():
+    codes = sorted(["GBAJY1200001", "GB0AJ1200001", "QMDA71418090", "ZZZZZ0000000"])
+    keys = [ISRC.parse(c).pack() for c in codes]
+    assert keys == sorted(keys)
+
+
+@pytest.mark.parametrize(
+    "isrc",
+    [ISRC("zzzzz", 12, 34567), ISRC("Some Owner", 12, 34567), ISRC("ZZZZZ", 123, 1)],
+)
+def test_pack_illegal(isrc: ISRC):
+    with pytest.raises(ValueError):
+        isrc.pack()
+
+
+def test_unpack_out_of_range():
+    with pytest.raises(ValueError):
+        ISRC.unpack(-1)
@@ -0,0 +1,84 @@
+import random
+from typing import List
+
+import pytest
+
+from iso3901 import ISRC, ISRCRangeSet
+
+
+def _codes(owner: str, year: int, start: int, stop: int) -> List[ISRC]:
+    return [ISRC(owner, year, d) for d in range(start, stop)]
+
+
+def test_build_unsorted():
+    codes = _codes("GBAJY", 12, 1, 500) + _codes("GBAJY", 12, 600, 700)
+    shuffled = codes * 2
+    random.Random(0).shuffle(shuffled)
+    rs = ISRCRangeSet(shuffled)
+    assert len(rs) == len(codes)
+    assert list(rs) == codes
+    assert list(rs.runs()) == [("GBAJY", 12, 1, 499), ("GBAJY", 12, 600, 699)]
+
+
+def test_membership():
+    rs = ISRCRangeSet.from_runs([("GBAJY", 12, 1, 9999)])
+    assert ISRC.parse("GB-AJY-12-00001") in rs
+    assert ISRC.parse("GB-AJY-12-09999") in rs
+    assert ISRC.parse("GB-AJY-12-10000") not in rs
+    assert ISRC.parse("GB-AJY-13-00001") not in rs
+    assert ISRC("Some Owner", 12, 1) not in rs
+    assert "GBAJY1200001" not in rs
+
+
+def test_runs_split_by_year():
+    rs = ISRCRangeSet.from_runs([("GBAJY", 12, 99990, 99999), ("GBAJY", 13, 0, 9)])
+    assert len(rs._starts) == 1
+    assert list(rs.runs()) == [("GBAJY", 12, 99990, 99999), ("GBAJY", 13, 0, 9)]
+
+
+def test_set_algebra():
+    a = ISRCRangeSet.from_runs([("GBAJY", 12, 0, 99), ("QMDA7", 14, 0, 49)])
+    b = ISRCRangeSet.from_runs([("GBAJY", 12, 50, 149), ("QMDA7", 14, 10, 19)])
+    sa, sb = set(a), set(b)
+    assert set(a | b) == sa | sb
+    assert set(a & b) == sa & sb
+    assert set(a - b) == sa - sb
+    assert set(b - a) == sb - sa
+    assert (a - a) == ISRCRangeSet()
+    assert not (a - a)
+    assert list((a | b).runs()) == [("GBAJY", 12, 0, 149), ("QMDA7", 14, 0, 49)]
+
+
+def test_random_algebra():
+    rng = random.Random(42)
+    a = ISRCRangeSet(ISRC("ZZZZZ", 1, rng.randrange(300)) for _ in range(200))
+    b = ISRCRangeSet(ISRC("ZZZZZ", 1, rng.randrange(300)) for _ in range(200))
+    sa, sb = set(a), set(b)
+    assert set(a | b) == sa | sb
+    assert set(a & b) == sa & sb
+    assert set(a - b) == sa - sb
+
+
+def test_serialize():
+    rs = ISRCRangeSet.from_runs([
+        ("GBAJY", 12, 1, 99999),
+        ("GBAJY", 13, 5, 5),
+        ("ZZZZZ", 99, 0, 10),
+    ])
+    data = rs.to_bytes()
+    assert len(data) < 30
+    restored = ISRCRangeSet.from_bytes(data)
+    assert restored == rs
+    assert hash(restored) == hash(rs)
+    assert ISRCRangeSet.from_bytes(ISRCRangeSet().to_bytes()) == ISRCRangeSet()
+
+
+@pytest.mark.parametrize("data", [b"", b"\x02\x00", b"\x01\x01\x80", b"\x01\x00\x00"])
+def test_serialize_malformed(data: bytes):
+    with pytest.raises(ValueError):
+        ISRCRangeSet.from_bytes(data)
+
+
+def test_empty_run():
+    with pytest.raises(ValueError):
+        ISRCRangeSet.from_runs([("GBAJY", 12, 5, 4)])
@@ -0,0 +1,68 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from iso3901 import ISRC
+from iso3901.reconcile import main, reconcile
+
+
+def _codes(start: int, stop: int) -> List[str]:
+    return [f"ZZ-ZZZ-12-{i:05d}" for i in range(start, stop)]
+
+
+@pytest.mark.parametrize("memory", [64 * 1024 * 1024, 2000])
+def test_reconcile(memory: int):
+    a = _codes(0, 600)[::-1] + ["zzzzz1200005", "bogus"]
+    b = _codes(400, 1000) + _codes(900, 901) * 3
+    result = {k: [] for k in ("only_a", "only_b", "both", "dup_a", "dup_b")}
+    stats = reconcile(
+        a,
+        b,
+        memory=memory,
+        **{k: v.append for k, v in result.items()},  # type: ignore[arg-type]
+    )
+    assert result["only_a"] == [ISRC.parse(c) for c in _codes(0, 400)]
+    assert result["only_b"] == [ISRC.parse(c) for c in _codes(600, 1000)]
+    assert result["both"] == [ISRC.parse(c) for c in _codes(400, 600)]
+    assert result["dup_a"] == [ISRC.parse("ZZZZZ1200005")]
+    assert result["dup_b"] == [ISRC.parse("ZZZZZ1200900")]
+    assert stats == (400, 400, 200, 1, 1, 1, 0)
+
+
+def test_cli(tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    (tmp_path / "a.txt").write_text("ZZZZZ1200001\nZZZZZ1200002\n")
+    (tmp_path / "b.txt").write_text("ZZ-ZZZ-12-00002\nZZ-ZZZ-12-00003\n")
+    main([str(tmp_path / "a.txt"), str(tmp_path / "b.txt"), "-o", str(tmp_path)])
+    assert (tmp_path / "only_a.txt").read_text() == "ZZZZZ1200001\n"
+    assert (tmp_path / "both.txt").read_text() == "ZZZZZ1200002\n"
+    assert (tmp_path / "only_b.txt").read_text() == "ZZZZZ1200003\n"
+    assert "both: 1" in capsys.readouterr().out
+
+
+def test_many_runs():
+    from iso3901.reconcile import _FAN_IN, _KEY_COST, _ExternalSorter
+
+    codes = _codes(0, 20000)
+    sorter = _ExternalSorter(20 * _KEY_COST, None)
+    try:
+        sorter.feed(reversed(codes))
+        assert len(sorter._runs) > _FAN_IN * 2
+        merged = list(sorter.merged())
+        assert len(sorter._runs) <= _FAN_IN
+        assert merged == [ISRC.parse(c).pack() for c in codes]
+    finally:
+        sorter.close()
+
+
+def test_open_file_limit():
+    resource = pytest.importorskip("resource")
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    codes = _codes(0, 12000)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (220, hard))
+    try:
+        # Each side spills about 300 runs, far more than fan-in
+        stats = reconcile(codes[::-1], codes[6000:], memory=40 * 48)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert stats == (6000, 0, 6000, 0, 0, 0, 0)
@@ -0,0 +1,188 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from iso3901.service import ValidationService
+
+
+async def _request(
+    address: Tuple[str, int],
+    method: str,
+    path: str,
+    payload: Optional[Any] = None,
+    raw_body: Optional[bytes] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    reader, writer = await asyncio.open_connection(*address)
+    body = raw_body if raw_body is not None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, content = data.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+def test_single():
+    async def run():
+        async with ValidationService() as service:
+            addr = service.address
+            status, result = await _request(
+                addr, "POST", "/validate", {"isrc": "gb-ajy-12-34567"}
+            )
+            assert status == 200
+            assert result["valid"]
+            assert result["isrc"] == "GBAJY1234567"
+            assert result["agency"] == "PPL UK"
+            status, result = await _request(
+                addr, "POST", "/validate", {"isrc": "XY-ZZZ-12-34567"}
+            )
+            assert status == 200
+            assert not result["valid"]
+            assert "XY" in result["error"]
+            status, result = await _request(addr, "POST", "/validate", {"isrc": 1})
+            assert not result["valid"]
+
+    asyncio.run(run())
+
+
+def test_batch():
+    async def run():
+        async with ValidationService() as service:
+            status, result = await _request(
+                service.address,
+                "POST",
+                "/validate/batch",
+                {"isrcs": ["ZZZZZ1234567", "bogus", None]},
+            )
+            assert status == 200
+            assert [r["valid"] for r in result["results"]] == [True, False, False]
+
+    asyncio.run(run())
+
+
+def test_coalesce_and_stats():
+    async def run():
+        async with ValidationService(max_delay=0.01) as service:
+            codes = [f"ZZ-ZZZ-12-{i:05d}" for i in range(50)]
+            results = await asyncio.gather(
+                *(
+                    _request(service.address, "POST", "/validate", {"isrc": c})
+                    for c in codes
+                )
+            )
+            assert [r["isrc"] for _, r in results] == [
+                c.replace("-", "") for c in codes
+            ]
+            status, stats = await _request(service.address, "GET", "/stats", None)
+            assert status == 200
+            assert stats["requests"] == 50
+            assert 0 < stats["batches"] < 50
+            assert stats["latency_ms"]["p50"] <= stats["latency_ms"]["p99"]
+
+    asyncio.run(run())
+
+
+def test_errors():
+    async def run():
+        async with ValidationService(max_inflight=2, max_body=100) as service:
+            addr = service.address
+            assert (await _request(addr, "GET", "/nowhere", None))[0] == 404
+            assert (await _request(addr, "GET", "/validate", None))[0] == 405
+            assert (await _request(addr, "POST", "/validate", raw_body=b"{"))[0] == 400
+            assert (await _request(addr, "POST", "/validate", {"x": 1}))[0] == 400
+            status, _ = await _request(
+                addr, "POST", "/validate/batch", {"isrcs": ["a", "b", "c"]}
+            )
+            assert status == 503
+            status, _ = await _request(
+                addr, "POST", "/validate/batch", {"isrcs": ["ZZZZZ1234567"] * 20}
+            )
+            assert status == 413
+
+    asyncio.run(run())
+
+
+def test_malformed_body():
+    async def run():
+        async with ValidationService() as service:
+            addr = service.address
+            nested = b"[" * 200000 + b"]" * 200000
+            status, _ = await _request(addr, "POST", "/validate", raw_body=nested)
+            assert status == 400
+
+            reader, writer = await asyncio.open_connection(*addr)
+            writer.write(b"POST /validate HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+            await writer.drain()
+            data = await reader.read()
+            writer.close()
+            assert data.split()[1] == b"400"
+
+            # Service keeps working afterwards
+            status, _ = await _request(addr, "POST", "/validate", {"isrc": "x"})
+            assert status == 200
+
+    asyncio.run(run())
+
+
+def test_keep_alive():
+    async def run():
+        async with ValidationService() as service:
+            reader, writer = await asyncio.open_connection(*service.address)
+            body = b'{"isrc": "ZZZZZ1234567"}'
+            for _ in range(3):
+                writer.write(
+                    b"POST /validate HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s"
+                    % (len(body), body)
+                )
+                status = await reader.readline()
+                assert status.startswith(b"HTTP/1.1 200")
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                assert json.loads(await reader.readexactly(length))["valid"]
+            writer.close()
+
+    asyncio.run(run())
+
+
+def test_lone_request_not_delayed():
+    async def run():
+        async with ValidationService(max_delay=5) as service:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            status, result = await _request(
+                service.address, "POST", "/validate", {"isrc": "ZZZZZ1234567"}
+            )
+            assert status == 200 and result["valid"]
+            assert loop.time() - start < 1
+
+    asyncio.run(run())
+
+
+def test_batch_counts_inflight():
+    async def run():
+        async with ValidationService(max_batch=10, max_inflight=1000) as service:
+            body = json.dumps({"isrcs": ["ZZZZZ1234567"] * 1000}).encode()
+            task = asyncio.ensure_future(
+                service._dispatch("POST", "/validate/batch", body)
+            )
+            await asyncio.sleep(0)
+            # Batch yields between slices, while still counted in flight
+            assert not task.done()
+            assert service.stats()["inflight"] == 1000
+            single = json.dumps({"isrc": "ZZZZZ1234567"}).encode()
+            status, _ = await service._dispatch("POST", "/validate", single)
+            assert status == 503
+            status, result = await task
+            assert status == 200 and len(result["results"]) == 1000
+            assert service.stats()["inflight"] == 0
+
+    asyncio.run(run())
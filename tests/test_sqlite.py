@@ -0,0 +1,111 @@
+import sqlite3
+
+import pytest
+
+from iso3901 import ISRC
+from iso3901.isrc import _pack
+from iso3901.sqlite import register_adapters, register_functions
+
+
+@pytest.fixture
+def conn():
+    register_adapters()
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    register_functions(conn)
+    yield conn
+    conn.close()
+
+
+def test_adapter_converter(conn: sqlite3.Connection):
+    isrc = ISRC.parse("GB-AJY-12-34567")
+    conn.execute("CREATE TABLE t (code ISRC PRIMARY KEY)")
+    conn.execute("INSERT INTO t VALUES (?)", (isrc,))
+    assert conn.execute("SELECT typeof(code) FROM t").fetchone() == ("integer",)
+    assert conn.execute("SELECT code FROM t").fetchone() == (isrc,)
+    assert conn.execute("SELECT code FROM t WHERE code = ?", (isrc,)).fetchone()
+
+
+@pytest.mark.parametrize(
+    "func, value, expected",
+    [
+        ("isrc_valid", "gb-ajy-12-34567", 1),
+        ("isrc_valid", "XY-AJY-12-34567", 0),
+        ("isrc_valid", 274007501234567, 1),
+        ("isrc_valid", -1, 0),
+        ("isrc_valid", None, None),
+        ("isrc_normalize", "ISRC gb-ajy-12-00007", "GBAJY1200007"),
+        ("isrc_normalize", 274007501234567, "GBAJY1234567"),
+        ("isrc_normalize", "bogus", None),
+        ("isrc_pack", "GB-AJY-12-34567", 274007501234567),
+        ("isrc_prefix", "QMDA71418090", "QM"),
+        ("isrc_agency", "QMDA71418090", "RIAA"),
+        ("isrc_year", "QMDA71418090", 14),
+        ("isrc_year", 1.5, None),
+    ],
+)
+def test_functions(
+    conn: sqlite3.Connection, func: str, value: object, expected: object
+):
+    assert conn.execute(f"SELECT {func}(?)", (value,)).fetchone() == (expected,)
+
+
+def test_bulk_update(conn: sqlite3.Connection):
+    conn.execute("CREATE TABLE t (code TEXT)")
+    conn.executemany(
+        "INSERT INTO t VALUES (?)",
+        [("gb-ajy-12-34567",), ("bogus",), ("ISRC QMDA71418090",)],
+    )
+    conn.execute("UPDATE t SET code = isrc_normalize(code) WHERE isrc_valid(code)")
+    invalid = conn.execute("SELECT code FROM t WHERE NOT isrc_valid(code)").fetchall()
+    assert invalid == [("bogus",)]
+    rows = conn.execute("SELECT code FROM t WHERE isrc_valid(code) ORDER BY code")
+    assert rows.fetchall() == [("GBAJY1234567",), ("QMDA71418090",)]
+    conn.execute("CREATE INDEX t_packed ON t (isrc_pack(code))")
+
+
+def test_converter_legacy_text(conn: sqlite3.Connection):
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, code ISRC)")
+    conn.executemany(
+        "INSERT INTO t (code) VALUES (?)",
+        [("GBAJY1234567",), ("isrc gb-ajy-12-00001",), ("bogus",), (None,)],
+    )
+    conn.execute("INSERT INTO t (code) VALUES (?)", (ISRC.parse("QMDA71418090"),))
+    rows = [r[0] for r in conn.execute("SELECT code FROM t ORDER BY id")]
+    assert rows == [
+        ISRC.parse("GBAJY1234567"),
+        ISRC.parse("GBAJY1200001"),
+        "bogus",
+        None,
+        ISRC.parse("QMDA71418090"),
+    ]
+    # Migrate legacy text into packed keys in-database
+    conn.execute("UPDATE t SET code = isrc_pack(code) WHERE isrc_valid(code)")
+    kinds = conn.execute("SELECT typeof(code) FROM t ORDER BY id").fetchall()
+    assert kinds == [("integer",), ("integer",), ("text",), ("null",), ("integer",)]
+
+
+def test_converter_agrees_with_valid(conn: sqlite3.Connection):
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, code ISRC)")
+    unallocated = _pack("AAAAA", 12, 1)
+    values = [
+        12,
+        -5,
+        unallocated,
+        ISRC.parse("GBAJY1234567").pack(),
+        b"GBAJY1234567",
+        b"\xff\xfe",
+        "AA-AAA-12-00001",
+    ]
+    conn.executemany("INSERT INTO t (code) VALUES (?)", [(v,) for v in values])
+    rows = [r[0] for r in conn.execute("SELECT code FROM t ORDER BY id")]
+    assert rows == [
+        12,
+        -5,
+        unallocated,
+        ISRC.parse("GBAJY1234567"),
+        ISRC.parse("GBAJY1234567"),
+        "��",
+        "AA-AAA-12-00001",
+    ]
+    valid = conn.execute("SELECT isrc_valid(code) FROM t ORDER BY id").fetchall()
+    assert [v for (v,) in valid] == [isinstance(r, ISRC) for r in rows]